@@ -8,6 +8,8 @@ from bamboo.lib.async import is_async, set_async
 ASYNC_FLAG = 'BAMBOO_ASYNC_OFF'
 DATABASE_NAME = 'bamboo_dev'
 TEST_DATABASE_NAME = DATABASE_NAME + '_test'
+# rows per insert message, pymongo 2.4 sends each batch as one message and
+# does not split it, so wide rows must stay under MongoDB's message size limit
 DB_SAVE_BATCH_SIZE = 3000
 DB_READ_BATCH_SIZE = 1000
 
@@ -279,7 +279,7 @@ class CountAggregation(Aggregation):
                 self.formula_name)[self.column.name].reset_index()
         else:
             result = self.dframe[self.groups]
-            result = result.groupby(self.groups).apply(lambda x: len(x)).\
+            result = result.groupby(self.groups).size().\
                 reset_index().rename(columns={0: self.name})
 
         return result
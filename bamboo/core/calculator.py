@@ -1,7 +1,8 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 
+from celery.exceptions import MaxRetriesExceededError
 from celery.task import task
-from pandas import concat
+import numpy as np
 
 from bamboo.core.aggregator import Aggregator
 from bamboo.core.frame import BambooFrame, NonUniqueJoinError
@@ -10,6 +11,54 @@ from bamboo.lib.async import call_async
 from bamboo.lib.mongo import MONGO_RESERVED_KEYS
 
 
+@task(default_retry_delay=5)
+def calculate_updates_batch(updates, parent_dataset_id=None, attempt=0):
+    """Background task to update several datasets in one message.
+
+    Each dataset is updated on its own.  Datasets that are not ready are sent
+    again in a new batch, up to `max_retries` times, without holding up the
+    others.  An update which fails is not resent, since it may already have
+    added rows, the error is raised once the other datasets are updated.
+
+    :param updates: A list of (dataset, new_data) tuples to update.
+    :param parent_dataset_id: If passed add ID as parent ID to column,
+        default is None.
+    :param attempt: The number of times these updates have been resent.
+
+    :raises: `MaxRetriesExceededError` if a dataset is still not ready after
+        `max_retries` attempts.
+    """
+    not_ready = []
+    error = None
+
+    for dataset, new_data in updates:
+        calculator = Calculator(dataset)
+
+        if not calculator.dataset.is_ready:
+            not_ready.append((dataset, new_data))
+            continue
+
+        try:
+            calculator.calculate_updates(calculator, new_data,
+                                         parent_dataset_id=parent_dataset_id)
+        except Exception, err:
+            error = err
+
+    if not_ready:
+        if attempt < calculate_updates_batch.max_retries:
+            call_async(calculate_updates_batch, not_ready,
+                       parent_dataset_id=parent_dataset_id,
+                       attempt=attempt + 1,
+                       countdown=calculate_updates_batch.default_retry_delay)
+        else:
+            raise MaxRetriesExceededError(
+                'Datasets not ready: %s' % ', '.join(
+                    dataset.dataset_id for dataset, _ in not_ready))
+
+    if error is not None:
+        raise error
+
+
 class Calculator(object):
     """Perform and store calculations and recalculations on update."""
 
@@ -68,31 +117,49 @@ class Calculator(object):
         """
         self._ensure_dframe()
 
-        aggregation, new_columns = self.make_columns(formula, name)
+        aggregation, new_columns = self.make_columns(
+            formula, name, self.dframe)
 
         if aggregation:
-            agg = Aggregator(self.dataset, self.dataset.dframe(),
+            agg = Aggregator(self.dataset, self.dframe,
                              groups, aggregation, name)
             agg.save(new_columns)
         else:
-            self.dataset.replace_observations(self.dframe.join(new_columns[0]))
+            self.dframe = self.dataset.replace_observations(
+                self.dframe.join(new_columns[0]))
 
         # propagate calculation to any merged child datasets
-        for merged_dataset in self.dataset.merged_datasets:
-            merged_calculator = Calculator(merged_dataset)
-            merged_calculator.propagate_column(self.dataset)
+        self._propagate_column_to_merged_datasets(self.dframe)
 
     def dependent_columns(self):
         return self.parser.context.dependent_columns
 
-    def propagate_column(self, parent_dataset):
-        """Propagate columns in `parent_dataset` to this dataset.
+    def _propagate_column_to_merged_datasets(self, dframe):
+        """Propagate columns to all merged descendants of this dataset.
 
-        This is used when there has been a new calculation added to
-        a dataset and that new column needs to be propagated to all
-        child (merged) datasets.
+        Walk the merge tree breadth first with a work queue. Each child
+        receives the updated dframe of its parent.
 
-        :param parent_dataset: The dataset to propagate to `self.dataset`.
+        :param dframe: The current dframe of this calculator's dataset.
+        """
+        queue = deque([(merged_dataset, self.dataset, dframe) for
+                       merged_dataset in self.dataset.merged_datasets])
+
+        while queue:
+            merged_dataset, parent_dataset, parent_dframe = queue.popleft()
+            merged_calculator = Calculator(merged_dataset)
+            updated_dframe = merged_calculator._propagate_column_one_level(
+                parent_dataset, parent_dframe)
+
+            queue.extend([
+                (child_dataset, merged_calculator.dataset, updated_dframe)
+                for child_dataset in merged_calculator.dataset.merged_datasets
+            ])
+
+    def _propagate_column_one_level(self, parent_dataset, parent_dframe):
+        """Replace the rows from `parent_dataset` in this dataset.
+
+        :returns: The updated dframe for this dataset.
         """
         # delete the rows in this dataset from the parent
         self.dataset.remove_parent_observations(parent_dataset.dataset_id)
@@ -101,20 +168,17 @@ class Calculator(object):
         dframe = self.dataset.dframe(keep_parent_ids=True)
 
         # create new dframe from the upated parent and add parent id
-        parent_dframe = parent_dataset.dframe().add_parent_column(
+        parent_dframe = parent_dframe.add_parent_column(
             parent_dataset.dataset_id)
 
         # merge this new dframe with the existing dframe
-        updated_dframe = concat([dframe, parent_dframe])
+        updated_dframe = dframe.fast_concat([parent_dframe])
 
         # save new dframe (updates schema)
-        self.dataset.replace_observations(updated_dframe)
+        updated_dframe = self.dataset.replace_observations(updated_dframe)
         self.dataset.clear_summary_stats()
 
-        # recur
-        for merged_dataset in self.dataset.merged_datasets:
-            merged_calculator = Calculator(merged_dataset)
-            merged_calculator.propagate_column(self.dataset)
+        return updated_dframe
 
     @task(default_retry_delay=5)
     def calculate_updates(self, new_data, new_dframe_raw=None,
@@ -136,6 +200,9 @@ class Calculator(object):
         self._ensure_dframe()
         self._ensure_ready(update_id)
 
+        if not isinstance(new_data, list):
+            new_data = [new_data]
+
         labels_to_slugs = self.dataset.schema.labels_to_slugs
 
         if new_dframe_raw is None:
@@ -153,14 +220,9 @@ class Calculator(object):
         if parent_dataset_id:
             new_dframe = new_dframe.add_parent_column(parent_dataset_id)
 
-        existing_dframe = self.dataset.dframe(keep_parent_ids=True)
-
-        # merge the two dframes
-        updated_dframe = concat([existing_dframe, new_dframe])
-
-        # update (overwrite) the dataset with the new merged dframe
-        self.dframe = self.dataset.replace_observations(
-            updated_dframe, set_num_columns=False)
+        # add the new rows, the stored dframe is now out of date
+        self.dataset.append_observations(new_dframe)
+        self.dframe = None
         self.dataset.clear_summary_stats()
 
         self._update_aggregate_datasets(aggregations, new_dframe)
@@ -182,9 +244,18 @@ class Calculator(object):
         if any([direction == 'left' for direction, _, on, __ in
                 self.dataset.joined_datasets]):
             if on in new_dframe_raw.columns and on in self.dframe.columns:
-                merged_join_column = concat(
-                    [new_dframe_raw[on], self.dframe[on]])
-                if len(merged_join_column) != merged_join_column.nunique():
+                new_column = new_dframe_raw[on]
+                column = self.dframe[on]
+                new_unique = new_column.unique()
+                unique = column.unique()
+
+                # unique within each column, without N/A (which unique keeps
+                # and nunique drops), and no values shared between them
+                if len(new_unique) != len(new_column) or\
+                        len(unique) != len(column) or\
+                        new_column.isnull().any() or column.isnull().any() or\
+                        np.intersect1d(
+                            new_unique, unique, assume_unique=True).size:
                     raise NonUniqueJoinError(
                         'Cannot update. This is the right hand join and the'
                         'column "%s" will become non-unique.' % on)
@@ -194,13 +265,12 @@ class Calculator(object):
         if dframe is None:
             dframe = self.dataset.dframe()
 
-        aggregation, functions = self.parser.parse_formula(formula)
+        aggregation, functions = self.parser.parse_columns(formula)
 
         new_columns = []
 
         for function in functions:
-            new_column = dframe.apply(
-                function, axis=1, args=(self.parser.context, ))
+            new_column = function(dframe, self.parser.context)
             new_column.name = name
             new_columns.append(new_column)
 
@@ -226,9 +296,8 @@ class Calculator(object):
             if calculation.aggregation is not None:
                 aggregations.append(calculation)
             else:
-                _, function = self.parser.parse_formula(calculation.formula)
-                new_column = new_dframe.apply(function[0], axis=1,
-                                              args=(self.parser.context, ))
+                _, function = self.parser.parse_columns(calculation.formula)
+                new_column = function[0](new_dframe, self.parser.context)
                 potential_name = calculation.name
 
                 if potential_name not in self.dframe.columns:
@@ -237,45 +306,42 @@ class Calculator(object):
                 else:
                     new_column.name = potential_name
 
-                new_dframe = new_dframe.join(new_column)
+                # later calculations may depend on this column, add it in
+                # place rather than copying the frame with a join
+                new_dframe[new_column.name] = new_column
 
         return new_dframe, aggregations
 
     def _update_merged_datasets(self, new_data, labels_to_slugs):
         # store slugs as labels for child datasets
-        slugified_data = []
-
-        if not isinstance(new_data, list):
-            new_data = [new_data]
-
-        for row in new_data:
-            for key, value in row.iteritems():
-                if labels_to_slugs.get(key) and key not in MONGO_RESERVED_KEYS:
-                    del row[key]
-                    row[labels_to_slugs[key]] = value
-
-            slugified_data.append(row)
+        slugified_data = [{
+            (labels_to_slugs[key] if labels_to_slugs.get(key) and
+             key not in MONGO_RESERVED_KEYS else key): value
+            for key, value in row.iteritems()} for row in new_data]
 
         # update the merged datasets with new_dframe
-        for merged_dataset in self.dataset.merged_datasets:
-            merged_calculator = Calculator(merged_dataset)
-            call_async(merged_calculator.calculate_updates,
-                       merged_calculator,
-                       slugified_data,
+        updates = [(merged_dataset, slugified_data) for merged_dataset in
+                   self.dataset.merged_datasets]
+
+        if updates:
+            call_async(calculate_updates_batch, updates,
                        parent_dataset_id=self.dataset.dataset_id)
 
     def _update_joined_datasets(self, new_dframe_raw):
+        updates = []
+
         # update any joined datasets
         for direction, other_dataset, on, joined_dataset in\
                 self.dataset.joined_datasets:
             if direction == 'left':
                 if on in new_dframe_raw.columns:
                     # only proceed if on in new dframe
-                    other_dframe = other_dataset.dframe(padded=True)
+                    on_dframe = other_dataset.dframe(columns=[on])
 
-                    if len(set(new_dframe_raw[on]).intersection(
-                            set(other_dframe[on]))):
+                    if on in on_dframe.columns and new_dframe_raw[on].isin(
+                            on_dframe[on].values).any():
                         # only proceed if new on value is in on column in lhs
+                        other_dframe = other_dataset.dframe(padded=True)
                         merged_dframe = other_dframe.join_dataset(
                             self.dataset, on)
                         joined_dataset.replace_observations(merged_dframe)
@@ -286,52 +352,67 @@ class Calculator(object):
                     merged_dframe = new_dframe_raw.join_dataset(
                         other_dataset, on)
 
-                joined_calculator = Calculator(joined_dataset)
-                call_async(joined_calculator.calculate_updates,
-                           joined_calculator, merged_dframe.to_jsondict(),
-                           parent_dataset_id=self.dataset.dataset_id)
+                updates.append((joined_dataset, merged_dframe.to_jsondict()))
+
+        if updates:
+            call_async(calculate_updates_batch, updates,
+                       parent_dataset_id=self.dataset.dataset_id)
 
     def dframe_from_update(self, new_data, labels_to_slugs):
-        """Make a single-row dataframe for the additional data to add."""
-        self._ensure_dframe()
+        """Make a dataframe for the additional data to add.
 
-        if not isinstance(new_data, list):
-            new_data = [new_data]
+        Build a dataframe from all rows at once, then rename, filter and
+        convert it column by column.
 
-        filtered_data = []
+        :param new_data: A list of rows to add.
+        """
+        self._ensure_dframe()
+
+        raw_dframe = BambooFrame(new_data)
         columns = self.dframe.columns
         dframe_empty = not len(columns)
 
         if dframe_empty:
             columns = self.dataset.schema.keys()
 
-        for row in new_data:
-            filtered_row = dict()
-            for col, val in row.iteritems():
-                # special case for reserved keys (e.g. _id)
-                if col in MONGO_RESERVED_KEYS:
-                    if (not len(columns) or col in columns) and\
-                            col not in filtered_row.keys():
-                        filtered_row[col] = val
-                else:
-                    # if col is a label take slug, if it's a slug take col
-                    slug = labels_to_slugs.get(
-                        col, col if col in labels_to_slugs.values() else None)
+        columns = set(columns)
+        slugs = set(labels_to_slugs.values())
+        schema = self.dataset.schema
+        filtered_data = {}
+
+        for col in raw_dframe.columns:
+            column = raw_dframe[col]
 
-                    # if slug is valid of there is an empty dframe
-                    if (slug or col in labels_to_slugs.keys()) and (
-                            dframe_empty or slug in columns):
-                        filtered_row[slug] = self.dataset.schema.convert_type(
-                            slug, val)
+            # special case for reserved keys (e.g. _id)
+            if col in MONGO_RESERVED_KEYS:
+                if (not len(columns) or col in columns) and\
+                        col not in filtered_data:
+                    filtered_data[col] = column
+            else:
+                # if col is a label take slug, if it's a slug take col
+                slug = labels_to_slugs.get(col, col if col in slugs else None)
+
+                # if slug is valid of there is an empty dframe
+                if (slug or col in labels_to_slugs) and (
+                        dframe_empty or slug in columns):
+                    column = schema.convert_column(slug, column)
+
+                    if slug in filtered_data:
+                        # a label and its slug were both passed
+                        column = column.combine_first(filtered_data[slug])
 
-            filtered_data.append(filtered_row)
+                    filtered_data[slug] = column
 
-        return BambooFrame(filtered_data)
+        return BambooFrame(filtered_data, index=raw_dframe.index)
 
     def _update_aggregate_datasets(self, calculations, new_dframe):
         calcs_to_data = self._create_calculations_to_groups_and_datasets(
             calculations)
 
+        if calcs_to_data:
+            # aggregations are recalculated on the full updated dframe
+            self._ensure_dframe()
+
         for formula, slug, group_str, dataset in calcs_to_data:
             groups = self.dataset.split_groups(group_str)
             self._update_aggregate_dataset(formula, new_dframe, slug, groups,
@@ -366,16 +447,18 @@ class Calculator(object):
 
         # jsondict from new dframe
         new_data = new_agg_dframe.to_jsondict()
+        updates = []
 
         for merged_dataset in agg_dataset.merged_datasets:
             # remove rows in child from this merged dataset
             merged_dataset.remove_parent_observations(
                 agg_dataset.dataset_id)
+            updates.append((merged_dataset, new_data))
 
-            # calculate updates on the child
-            merged_calculator = Calculator(merged_dataset)
-            call_async(merged_calculator.calculate_updates, merged_calculator,
-                       new_data, parent_dataset_id=agg_dataset.dataset_id)
+        # calculate updates on the children
+        if updates:
+            call_async(calculate_updates_batch, updates,
+                       parent_dataset_id=agg_dataset.dataset_id)
 
     def _create_calculations_to_groups_and_datasets(self, calculations):
         """Create list of groups and calculations."""
@@ -404,8 +487,9 @@ class Calculator(object):
         ]
 
     def __getstate__(self):
-        """Get state for pickle."""
-        return [self.dataset, self.parser]
+        """Get state for pickle, the parser is rebuilt from the dataset."""
+        return [self.dataset]
 
     def __setstate__(self, state):
-        self.dataset, self.parser = state
+        self.dataset, = state
+        self.parser = Parser(self.dataset)
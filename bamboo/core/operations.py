@@ -3,14 +3,64 @@ from __future__ import division
 import operator
 
 import numpy as np
+from pandas import Series
 from scipy.stats import percentileofscore
 
 from bamboo.lib.datetools import safe_parse_date_to_unix_time,\
     parse_str_to_unix_time
 
 
+def _is_column(value):
+    return isinstance(value, np.ndarray)
+
+
+def _float64(value):
+    """Cast a column or a scalar to float64.
+
+    Columns which are already float64 are returned as is, not copied, so the
+    result must only be read.
+    """
+    if _is_column(value):
+        return np.asarray(value, dtype=np.float64)
+
+    return np.float64(value)
+
+
+def _bool(value):
+    """Cast a column or a scalar to bool."""
+    if _is_column(value):
+        return value.astype(np.bool_)
+
+    return np.bool_(value)
+
+
+def _combine(operation, left, right):
+    """Apply a commutative `operation`, keeping any column on the left."""
+    if not _is_column(left):
+        left, right = right, left
+
+    return operation(left, right)
+
+
+def _broadcast(value, length):
+    """Return `value` as a column of `length` if it is a scalar."""
+    if _is_column(value):
+        return value
+
+    column = np.empty(length, dtype=np.object_)
+    column.fill(value)
+
+    return column
+
+
 class EvalTerm(object):
-    """Base class for evaluation."""
+    """Base class for evaluation.
+
+    Terms are evaluated either on a single row with `eval` or on all rows of a
+    DataFrame at once with `eval_dframe`.  The latter works on the raw column
+    arrays and returns an ndarray or, for terms which do not depend on any
+    column, a scalar.
+    """
 
     def __init__(self, tokens):
         self.tokens = tokens
@@ -46,6 +96,20 @@ class EvalConstant(EvalTerm):
             # test is date and parse as date
             return self._parse_field(field, context)
 
+    def eval_dframe(self, dframe, context):
+        try:
+            return np.float64(self.value)
+        except ValueError:
+            # it may be a variable
+            column = dframe[self.value]
+            context.dependent_columns.add(self.value)
+            schema = context.schema
+
+            if schema and schema.is_date_simpletype(self.value):
+                column = column.map(safe_parse_date_to_unix_time)
+
+            return column.values
+
     def _parse_field(self, field, context):
             schema = context.schema
 
@@ -64,6 +128,9 @@ class EvalString(EvalTerm):
     def eval(self, row, context):
         return self.value
 
+    def eval_dframe(self, dframe, context):
+        return self.value
+
 
 class EvalSignOp(EvalTerm):
     """Class to evaluate expressions with a leading + or - sign."""
@@ -75,6 +142,10 @@ class EvalSignOp(EvalTerm):
         mult = {'+': 1, '-': -1}[self.sign]
         return mult * self.value.eval(row, context)
 
+    def eval_dframe(self, dframe, context):
+        mult = {'+': 1, '-': -1}[self.sign]
+        return mult * self.value.eval_dframe(dframe, context)
+
 
 class EvalBinaryArithOp(EvalTerm):
     """Class for evaluating binary arithmetic operations."""
@@ -87,6 +158,14 @@ class EvalBinaryArithOp(EvalTerm):
         '^': operator.__pow__,
     }
 
+    ufuncs = {
+        '+': np.add,
+        '-': np.subtract,
+        '*': np.multiply,
+        '/': np.true_divide,
+        '^': np.power,
+    }
+
     def eval(self, row, context):
         result = np.float64(self.value[0].eval(row, context))
 
@@ -98,6 +177,28 @@ class EvalBinaryArithOp(EvalTerm):
 
         return result
 
+    def eval_dframe(self, dframe, context):
+        result = _float64(self.value[0].eval_dframe(dframe, context))
+        owned = False
+
+        for oper, val in self.operator_operands(self.value[1:]):
+            val = _float64(val.eval_dframe(dframe, context))
+            ufunc = self.ufuncs[oper]
+
+            if owned:
+                # result was allocated by a previous operation, reuse it
+                ufunc(result, val, out=result)
+            else:
+                result = ufunc(result, val)
+                owned = _is_column(result)
+
+            if _is_column(result):
+                result[np.isinf(result)] = np.nan
+            elif np.isinf(result):
+                result = np.nan
+
+        return result
+
 
 class EvalMultOp(EvalBinaryArithOp):
     """Class to distinguish precedence of multiplication/division expressions.
@@ -144,6 +245,21 @@ class EvalComparisonOp(EvalTerm):
 
         return False
 
+    def eval_dframe(self, dframe, context):
+        val1 = _float64(self.value[0].eval_dframe(dframe, context))
+        result = None
+
+        for oper, val in self.operator_operands(self.value[1:]):
+            fn = EvalComparisonOp.opMap[oper]
+            val2 = _float64(val.eval_dframe(dframe, context))
+            comparison = fn(val1, val2)
+            result = comparison if result is None else _combine(
+                EvalBinaryBooleanOp.column_operations['and'], result,
+                comparison)
+            val1 = val2
+
+        return result
+
 
 class EvalNotOp(EvalTerm):
     """Class to evaluate not expressions."""
@@ -154,6 +270,10 @@ class EvalNotOp(EvalTerm):
     def eval(self, row, context):
         return not self.value.eval(row, context)
 
+    def eval_dframe(self, dframe, context):
+        value = _bool(self.value.eval_dframe(dframe, context))
+        return ~value if _is_column(value) else not value
+
 
 class EvalBinaryBooleanOp(EvalTerm):
     """Class for evaluating binary boolean operations."""
@@ -163,6 +283,11 @@ class EvalBinaryBooleanOp(EvalTerm):
         'or': lambda p, q: p or q,
     }
 
+    column_operations = {
+        'and': lambda p, q: p & q,
+        'or': lambda p, q: p | q,
+    }
+
     def eval(self, row, context):
         result = np.bool_(self.value[0].eval(row, context))
 
@@ -172,6 +297,15 @@ class EvalBinaryBooleanOp(EvalTerm):
 
         return result
 
+    def eval_dframe(self, dframe, context):
+        result = _bool(self.value[0].eval_dframe(dframe, context))
+
+        for oper, val in self.operator_operands(self.value[1:]):
+            val = _bool(val.eval_dframe(dframe, context))
+            result = _combine(self.column_operations[oper], result, val)
+
+        return result
+
 
 class EvalAndOp(EvalBinaryBooleanOp):
     """Class to distinguish precedence of and expressions."""
@@ -196,6 +330,15 @@ class EvalInOp(EvalTerm):
 
         return val_to_test in val_list
 
+    def eval_dframe(self, dframe, context):
+        val_to_test = self.value[0].eval_dframe(dframe, context)
+        val_list = [val.eval_dframe(dframe, context) for val in self.value[1:]]
+
+        if _is_column(val_to_test):
+            return Series(val_to_test).map(str).isin(val_list).values
+
+        return str(val_to_test) in val_list
+
 
 class EvalCaseOp(EvalTerm):
     """Class to eval case statements."""
@@ -209,6 +352,19 @@ class EvalCaseOp(EvalTerm):
 
         return np.nan
 
+    def eval_dframe(self, dframe, context):
+        result = _broadcast(np.nan, len(dframe))
+        undecided = np.ones(len(dframe), dtype=np.bool_)
+
+        for token in self.value:
+            case_result = _broadcast(
+                token.eval_dframe(dframe, context), len(dframe))
+            decided = undecided & case_result.astype(np.bool_)
+            result[decided] = case_result[decided]
+            undecided &= ~decided
+
+        return result
+
 
 class EvalMapOp(EvalTerm):
     """Class to eval map statements."""
@@ -219,6 +375,17 @@ class EvalMapOp(EvalTerm):
 
         return False
 
+    def eval_dframe(self, dframe, context):
+        value = _broadcast(
+            self.tokens[1].eval_dframe(dframe, context), len(dframe))
+
+        if self.tokens[0] == 'default':
+            return value
+
+        condition = _bool(self.tokens[0].eval_dframe(dframe, context))
+
+        return np.where(condition, value.astype(np.object_), False)
+
 
 class EvalFunction(object):
     """Class to eval functions."""
@@ -234,6 +401,9 @@ class EvalDate(EvalFunction):
         # parse date from string
         return parse_str_to_unix_time(self.value.eval(row, context))
 
+    def eval_dframe(self, dframe, context):
+        return parse_str_to_unix_time(self.value.eval_dframe(dframe, context))
+
 
 class EvalPercentile(EvalFunction):
     """Class to evaluate percentile expressions."""
@@ -243,3 +413,8 @@ class EvalPercentile(EvalFunction):
         column = context.dframe[self.value.value]
         field = self.value.field(row)
         return percentileofscore(column, field)
+
+    def eval_dframe(self, dframe, context):
+        column = context.dframe[self.value.value]
+        return dframe[self.value.value].map(
+            lambda field: percentileofscore(column, field)).values
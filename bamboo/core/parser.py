@@ -1,5 +1,9 @@
+from collections import OrderedDict
 from functools import partial
+from threading import Lock
 
+import numpy as np
+from pandas import Series
 from pyparsing import alphanums, nums, oneOf, opAssoc, operatorPrecedence,\
     CaselessLiteral, Combine, Keyword, Literal, MatchFirst, Optional,\
     ParseException, Regex, Word, ZeroOrMore
@@ -10,22 +14,66 @@ from bamboo.core.operations import EvalAndOp, EvalCaseOp, EvalComparisonOp,\
     EvalNotOp, EvalOrOp, EvalPercentile, EvalPlusOp, EvalSignOp, EvalString
 
 
+# guards Parser.parsed_formulas, which is shared by all threads
+_parsed_formulas_lock = Lock()
+
+
 class ParseError(Exception):
     """For errors while parsing formulas."""
     pass
 
 
+def eval_dframe(term, dframe, context):
+    """Evaluate the parsed `term` on all rows of `dframe` at once.
+
+    If the term can not be evaluated column-wise, e.g. because of mixed types
+    or missing columns, fall back to evaluating it row by row.
+
+    :param term: The parsed term to evaluate.
+    :param dframe: The DataFrame to evaluate the term on.
+    :param context: The parser context to evaluate the term in.
+
+    :returns: A Series indexed like `dframe`.
+    """
+    try:
+        column = term.eval_dframe(dframe, context)
+    except (KeyError, TypeError, ValueError):
+        return dframe.apply(term.eval, axis=1, args=(context, ))
+
+    if not isinstance(column, np.ndarray):
+        # constant formula, broadcast to all rows
+        column = [column] * len(dframe)
+    elif column.dtype.type == np.object_:
+        # let pandas infer the type as it does for row-wise results
+        column = column.tolist()
+
+    return Series(column, index=dframe.index)
+
+
 class ParserContext(object):
-    """Context to be passed into parser."""
+    """Context to be passed into parser.
 
+    The dframe of the dataset is only needed by some functions, e.g.
+    percentile, so it is fetched on first access.
+    """
+
+    dataset = None
     dependent_columns = set()
     schema = None
+    _dframe = None
 
     def __init__(self, dataset=None):
         if dataset:
-            self.dframe = dataset.dframe()
+            self.dataset = dataset
             self.schema = dataset.schema
 
+    @property
+    def dframe(self):
+        if self._dframe is None and self.dataset:
+            self._dframe = self.dataset.dframe()
+
+        return self._dframe
+
 
 class Parser(object):
     """Class for parsing and evaluating formula.
@@ -39,11 +87,15 @@ class Parser(object):
     - function_names: Names of possible functions in formulas.
     - operator_names: Names of possible operators in formulas.
     - parsed_expr: Cached parsed expression.
+    - parsed_formulas: Aggregations and terms of recently parsed formulas,
+      shared by all parsers, least recently used first.
     - special_names: Names of possible reserved names in formulas.
     - reserved_words: List of all possible reserved words that may be used in
       formulas.
     """
 
+    PARSED_FORMULAS_CACHE_SIZE = 1024
+
     aggregation = None
     aggregation_names = AGGREGATIONS.keys()
     bnf = None
@@ -51,6 +103,7 @@ class Parser(object):
     function_names = ['date', 'percentile', 'years']
     operator_names = ['and', 'or', 'not', 'in']
     parsed_expr = None
+    parsed_formulas = OrderedDict()
     special_names = ['default']
 
     reserved_words = aggregation_names + function_names + operator_names +\
@@ -59,7 +112,6 @@ class Parser(object):
     def __init__(self, dataset=None):
         """Create parser and set context."""
         self.context = ParserContext(dataset)
-        self._build_bnf()
 
     def store_aggregation(self, _, __, tokens):
         """Cached a parsed aggregation."""
@@ -259,10 +311,62 @@ class Parser(object):
         :returns: A tuple with the name of the aggregation in the formula, if
             any and a list of functions built from the input string.
         """
+        aggregation, terms = self._parse_terms(input_str)
+
+        return aggregation, [partial(term.eval) for term in terms]
+
+    def parse_columns(self, input_str):
+        """Parse formula and return functions evaluating whole columns.
+
+        Like `parse_formula` but the returned functions take a DataFrame and
+        the parser context and return a Series with the value of the formula
+        for every row of the DataFrame.
+
+        :param input_str: The string to parse.
+
+        :returns: A tuple with the name of the aggregation in the formula, if
+            any and a list of functions built from the input string.
+        """
+        aggregation, terms = self._parse_terms(input_str)
 
+        return aggregation, [partial(eval_dframe, term) for term in terms]
+
+    def _parse_terms(self, input_str):
+        """Parse `input_str` into an aggregation and evaluation terms.
+
+        Terms do not hold any context, so they are cached by formula string
+        and shared by all parsers.  Only formulas missing from the cache are
+        run through pyparsing.
+        """
         # reset dependent columns before parsing
         self.context.dependent_columns = set()
 
+        with _parsed_formulas_lock:
+            parsed = self.parsed_formulas.pop(input_str, None)
+
+            if parsed is not None:
+                self.parsed_formulas[input_str] = parsed
+
+        if parsed is None:
+            parsed = self._parse(input_str)
+
+            with _parsed_formulas_lock:
+                self.parsed_formulas[input_str] = parsed
+
+                if len(self.parsed_formulas) >\
+                        self.PARSED_FORMULAS_CACHE_SIZE:
+                    self.parsed_formulas.popitem(last=False)
+
+        self.aggregation = parsed[0]
+
+        return parsed
+
+    def _parse(self, input_str):
+        """Run `input_str` through the BNF, building it if necessary."""
+        self._build_bnf()
+        self.aggregation = None
+        self.column_functions = None
+
         try:
             self.parsed_expr = self.bnf.parseString(
                 input_str, parseAll=True)[0]
@@ -270,15 +374,10 @@ class Parser(object):
             raise ParseError('Parse Failure for string "%s": %s' % (input_str,
                              err))
 
-        functions = []
+        terms = self.column_functions if self.aggregation else [
+            self.parsed_expr]
 
-        if self.aggregation:
-            for column_function in self.column_functions:
-                functions.append(partial(column_function.eval))
-        else:
-            functions.append(partial(self.parsed_expr.eval))
-
-        return self.aggregation, functions
+        return self.aggregation, list(terms)
 
     def validate_formula(self, formula, row):
         """Validate the *formula* on an example *row* of data.
@@ -334,4 +433,3 @@ class Parser(object):
         self.aggregation, self.aggregation_names, self.function_names,\
             self.operator_names, self.special_names, self.reserved_words,\
             self.special_names, self.context = state
-        self._build_bnf()
@@ -7,6 +7,10 @@ from bamboo.lib.mongo import dict_from_mongo, dict_for_mongo
 MAX_CARDINALITY_FOR_COUNT = 10000
 SUMMARY = 'summary'
 
+# dtype types summarized by counts or by descriptive statistics
+COUNT_TYPES = (np.object_, np.bool_)
+DESCRIBE_TYPES = (np.float64, np.int64)
+
 
 class ColumnTypeError(Exception):
     """Exception when grouping on a non-dimensional column."""
@@ -21,12 +25,15 @@ def summarize_series(dtype, data):
 
     :returns: The appropriate summarization for the type of `dtype`.
     """
-    return {
-        np.object_: data.value_counts(),
-        np.bool_: data.value_counts(),
-        np.float64: data.describe(),
-        np.int64: data.describe(),
-    }.get(dtype.type, None)
+    dtype_type = dtype.type
+
+    if dtype_type in COUNT_TYPES:
+        return data.value_counts()
+
+    if dtype_type in DESCRIBE_TYPES:
+        return data.describe()
+
+    return None
 
 
 def summarizable(dframe, col, groups, dataset):
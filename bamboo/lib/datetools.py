@@ -20,10 +20,11 @@ def recognize_dates(dframe):
     :returns: A DataFrame with column values convert to datetime types.
     """
     new_dframe = copy.deepcopy(dframe)
+    object_columns = dframe.columns[
+        dframe.dtypes.values == np.dtype(np.object_)]
 
-    for idx, dtype in enumerate(dframe.dtypes):
-        if dtype.type == np.object_:
-            _convert_column_to_date(new_dframe, dframe.columns[idx])
+    for column in object_columns:
+        _convert_column_to_date(new_dframe, column)
 
     return new_dframe
 
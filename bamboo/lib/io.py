@@ -1,6 +1,7 @@
 from functools import partial
 import simplejson as json
 import os
+import shutil
 import tempfile
 
 from celery.task import task
@@ -78,7 +79,9 @@ def create_dataset_from_csv(csv_file):
     :returns: The created dataset.
     """
     tmpfile = tempfile.NamedTemporaryFile(delete=False)
-    tmpfile.write(csv_file.file.read())
+
+    # stream in chunks to avoid holding the whole upload in memory
+    shutil.copyfileobj(csv_file.file, tmpfile)
 
     # pandas needs a closed file for *read_csv*
     tmpfile.close()
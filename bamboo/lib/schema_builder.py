@@ -1,5 +1,6 @@
 from datetime import datetime
 import numpy as np
+from pandas import Series
 import re
 
 from bamboo.core.frame import BAMBOO_RESERVED_KEYS
@@ -49,6 +50,8 @@ RE_ENCODED_COLUMN = re.compile(r'\W')
 
 
 class Schema(dict):
+    _labels_to_slugs = None
+
     @classmethod
     def safe_init(cls, arg):
         """Make schema with potential arg of None."""
@@ -56,11 +59,29 @@ class Schema(dict):
 
     @property
     def labels_to_slugs(self):
-        """Build dict from column labels to slugs."""
-        return {
-            column_attrs[LABEL]: reserve_encoded(column_name) for
-            (column_name, column_attrs) in self.items()
-        }
+        """Build dict from column labels to slugs.
+
+        The dict is built once and cached until the schema is modified.
+        """
+        if self._labels_to_slugs is None:
+            self._labels_to_slugs = {
+                column_attrs[LABEL]: reserve_encoded(column_name) for
+                (column_name, column_attrs) in self.items()
+            }
+
+        return self._labels_to_slugs
+
+    def __setitem__(self, key, value):
+        self._labels_to_slugs = None
+        super(Schema, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._labels_to_slugs = None
+        super(Schema, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._labels_to_slugs = None
+        super(Schema, self).update(*args, **kwargs)
 
     def cardinality(self, column):
         if self.is_dimension(column):
@@ -106,13 +127,28 @@ class Schema(dict):
                 column, labels_to_slugs, dframe)
         }
 
-    def convert_type(self, slug, value):
+    def convert_column(self, slug, column):
+        """Convert all non-null values in `column` to the type of `slug`.
+
+        :param slug: The slug of the column in this schema.
+        :param column: The Series to convert.
+
+        :returns: The converted Series.
+        """
         column_schema = self.get(slug)
         if column_schema:
-            type_func = SIMPLETYPE_TO_DTYPE.get(column_schema[SIMPLETYPE])
-            if type_func:
-                value = type_func(value)
-        return value
+            dtype = SIMPLETYPE_TO_DTYPE.get(column_schema[SIMPLETYPE])
+            if dtype:
+                notnull = column.notnull()
+
+                if notnull.all():
+                    return column.astype(dtype)
+
+                # NaN has no integer representation, cast only the values
+                converted = column.astype(np.object_)
+                converted[notnull] = column[notnull].astype(dtype)
+                column = Series(converted.tolist(), index=column.index)
+        return column
 
     def _resluggable_column(self, column, labels_to_slugs, dframe):
         """Test if column should be slugged.
@@ -194,7 +194,8 @@ class AbstractModel(object):
         :param dframe: A DataFrame to save in the current model.
         """
         def command(records):
-            self.collection.insert(records, safe=True)
+            # unordered bulk insert, the server does not stop at an error
+            self.collection.insert(records, safe=True, continue_on_error=True)
 
         self._batch_command(command, dframe)
 
@@ -207,10 +208,13 @@ class AbstractModel(object):
 
     def _batch_command(self, command, dframe):
         batches = int(ceil(float(len(dframe)) / DB_SAVE_BATCH_SIZE))
+        columns = dframe.columns.tolist()
 
         for batch in xrange(0, batches):
             start = batch * DB_SAVE_BATCH_SIZE
             end = (batch + 1) * DB_SAVE_BATCH_SIZE
+
+            # zip raw rows with the columns rather than build a Series per row
             records = [
-                row.to_dict() for (_, row) in dframe[start:end].iterrows()]
+                dict(zip(columns, row)) for row in dframe[start:end].values]
             command(records)
@@ -14,7 +14,7 @@ from bamboo.core.frame import BambooFrame, BAMBOO_RESERVED_KEY_PREFIX,\
 from bamboo.core.summary import summarize
 from bamboo.lib.async import call_async
 from bamboo.lib.exceptions import ArgumentError
-from bamboo.lib.schema_builder import Schema
+from bamboo.lib.schema_builder import CARDINALITY, Schema
 from bamboo.models.abstract_model import AbstractModel
 from bamboo.models.calculation import Calculation
 from bamboo.models.observation import Observation
@@ -51,6 +51,9 @@ class Dataset(AbstractModel):
     SCHEMA = 'schema'
     UPDATED_AT = 'updated_at'
 
+    _schema = None
+    _schema_record = None
+
     # commonly accessed variables
     @property
     def dataset_observation_id(self):
@@ -70,12 +73,19 @@ class Dataset(AbstractModel):
 
     @property
     def schema(self):
-        schema_dict = {}
+        """The schema for this dataset, cached until the record changes."""
+        record = self.record
+
+        if self._schema is None or self._schema_record is not record:
+            schema_dict = {}
+
+            if record:
+                schema_dict = record.get(self.SCHEMA)
 
-        if self.record:
-            schema_dict = self.record.get(self.SCHEMA)
+            self._schema = Schema.safe_init(schema_dict)
+            self._schema_record = record
 
-        return Schema.safe_init(schema_dict)
+        return self._schema
 
     @property
     def labels(self):
@@ -137,10 +147,13 @@ class Dataset(AbstractModel):
         return self.find_one(_id) if _id else None
 
     def dframe(self, query=None, select=None, distinct=None,
-               keep_parent_ids=False, limit=0, order_by=None, padded=False):
+               keep_parent_ids=False, limit=0, order_by=None, padded=False,
+               columns=None):
         """Fetch the dframe for this dataset.
 
         :param select: An optional select to limit the fields in the dframe.
+        :param columns: An optional list of columns to fetch, this is passed
+            to MongoDB as a projection and overrides `select`.
         :param keep_parent_ids: Do not remove parent IDs from the dframe,
             default False.
         :param limit: Limit on the number of rows in the returned dframe.
@@ -156,6 +169,9 @@ class Dataset(AbstractModel):
             passed to MongoDB. BambooFrame will not have parent ids if
             `keep_parent_ids` is False.
         """
+        if columns is not None:
+            select = json.dumps(dict.fromkeys(columns, 1))
+
         observations = self.observations(
             query=query, select=select, limit=limit, order_by=order_by,
             as_cursor=True)
@@ -393,6 +409,10 @@ class Dataset(AbstractModel):
         self.add_pending_update(update_id)
 
         new_data = json.loads(json_data)
+
+        if not isinstance(new_data, list):
+            new_data = [new_data]
+
         calculator = Calculator(self)
 
         new_dframe_raw = calculator.dframe_from_update(
@@ -427,6 +447,59 @@ class Dataset(AbstractModel):
 
         return self.save_observations(dframe)
 
+    def append_observations(self, dframe):
+        """Add the rows in `dframe` to this dataset's observations.
+
+        Unlike `replace_observations` the existing rows are neither read nor
+        rewritten.  The schema keeps its entries for existing columns, with
+        their cardinalities increased by the number of new distinct values,
+        and gains entries for new columns.
+
+        :param dframe: The DataFrame with rows to add.
+        """
+        dframe = dframe.rename(
+            columns=self.schema.rename_map_for_dframe(dframe))
+        current_schema = Schema(self.schema)
+        cardinalities = {
+            column: current_schema.cardinality(column) + len(new_values) for
+            column, new_values in self._new_values(
+                dframe, current_schema).iteritems()
+        }
+
+        new_schema = self.schema.rebuild(dframe)
+
+        for column, column_schema in current_schema.items():
+            if column in cardinalities:
+                column_schema = dict(column_schema)
+                column_schema[CARDINALITY] = cardinalities[column]
+
+            new_schema[column] = column_schema
+
+        self.set_schema(new_schema, set_num_columns=False)
+
+        dframe = self.add_id_column_to_dframe(dframe)
+        Observation().batch_save(dframe)
+
+        # increment in MongoDB so concurrent appends do not lose rows
+        self.collection.update(
+            {'_id': self.record['_id']},
+            {'$inc': {self.NUM_ROWS: len(dframe)}}, safe=True)
+        self.reload()
+
+    def _new_values(self, dframe, schema):
+        """Return distinct values in `dframe` not yet stored, by column.
+
+        Only columns with a cardinality in `schema` are checked.
+        """
+        values = {
+            column: set(dframe[column].dropna().unique().tolist()) for
+            column in dframe.columns if schema.cardinality(column) is not None
+        }
+        stored = Observation.stored_values(self, values)
+
+        return {column: column_values - stored[column] for
+                column, column_values in values.iteritems()}
+
     def drop_columns(self, columns):
         """Remove columns from this dataset's observations.
 
@@ -62,6 +62,26 @@ class Observation(AbstractModel):
             query, select, as_dict=True, limit=limit, order_by=order_by,
             as_cursor=as_cursor)
 
+    @classmethod
+    def stored_values(cls, dataset, values):
+        """Return which of `values` are stored for `dataset`.
+
+        Each column is checked with a `distinct` query, so MongoDB returns at
+        most the values looked for rather than the matching rows.
+
+        :param dataset: Dataset to check rows for.
+        :param values: A dict of columns to sets of values to look for.
+
+        :returns: A dict of columns to sets of the matching stored values.
+        """
+        return {
+            column: set(cls.collection.find({
+                DATASET_OBSERVATION_ID: dataset.dataset_observation_id,
+                column: {'$in': list(column_values)},
+            }).distinct(column)) if column_values else set()
+            for column, column_values in values.iteritems()
+        }
+
     def save(self, dframe, dataset):
         """Save data in `dframe` with the `dataset`.
 
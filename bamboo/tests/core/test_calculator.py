@@ -1,5 +1,9 @@
+from celery.exceptions import MaxRetriesExceededError
+from mock import patch
+
 from bamboo.core.parser import Parser
-from bamboo.core.calculator import Calculator
+from bamboo.core.calculator import calculate_updates_batch, Calculator
+from bamboo.core.frame import NonUniqueJoinError
 from bamboo.lib.datetools import recognize_dates
 from bamboo.models.dataset import Dataset
 from bamboo.tests.test_base import TestBase
@@ -52,3 +56,57 @@ class TestCalculator(TestBase):
             self.column_labels_to_slugs = self.dataset.schema.labels_to_slugs
 
             self._test_calculation_results(name, formula)
+
+    def test_calculate_updates_batch_not_ready(self):
+        num_rows = len(self.dataset.dframe())
+        self.dataset.pending()
+
+        self.assertRaises(
+            MaxRetriesExceededError, calculate_updates_batch,
+            [(self.dataset, [{'food_type': 'lunch', 'amount': 1}])])
+        self.assertEqual(len(self.dataset.dframe()), num_rows)
+
+    def test_calculate_updates_batch_failure_not_resent(self):
+        other_dataset = Dataset()
+        other_dataset.save(self.test_dataset_ids['good_eats.csv'])
+        other_dataset.save_observations(
+            recognize_dates(self.get_data('good_eats.csv')))
+        num_rows = len(self.dataset.dframe())
+        other_num_rows = len(other_dataset.dframe())
+        new_data = [{'food_type': 'lunch', 'amount': 1}]
+
+        with patch.object(Calculator, '_check_update_is_valid',
+                          side_effect=[NonUniqueJoinError(''), None]) as mock:
+            self.assertRaises(
+                NonUniqueJoinError, calculate_updates_batch,
+                [(self.dataset, new_data), (other_dataset, new_data)])
+            self.assertEqual(mock.call_count, 2)
+
+        # the failed update is not resent, its sibling is still updated
+        self.assertEqual(len(self.dataset.dframe()), num_rows)
+        self.assertEqual(len(other_dataset.dframe()), other_num_rows + 1)
+
+    def test_dframe_from_update_label_and_slug(self):
+        labels_to_slugs = self.dataset.schema.labels_to_slugs
+        label = 'amount + gps_alt'
+        slug = labels_to_slugs[label]
+        calculator = Calculator(self.dataset)
+
+        dframe = calculator.dframe_from_update(
+            [{label: 1.0}, {slug: 2.0}, {label: 3.0, slug: 4.0}],
+            labels_to_slugs)
+
+        self.assertFalse(label in dframe.columns)
+        self.assertEqual(dframe[slug].tolist()[:2], [1.0, 2.0])
+        self.assertTrue(dframe[slug][2] in [3.0, 4.0])
+
+    def test_dframe_from_update_reserved_keys(self):
+        calculator = Calculator(self.dataset)
+
+        dframe = calculator.dframe_from_update(
+            [{'_id': 'new_id', 'amount': 1}, {'amount': 2}],
+            self.dataset.schema.labels_to_slugs)
+
+        self.assertEqual(dframe['_id'][0], 'new_id')
+        self.assertTrue(dframe['_id'].isnull()[1])
+        self.assertEqual(dframe['amount'].tolist(), [1, 2])
@@ -83,6 +83,16 @@ class TestFrame(TestBase):
         self.assertFalse(PARENT_DATASET_ID in bframe_only.columns)
         self.assertEqual(len(bframe_only), len_parent_rows)
 
+    def test_fast_concat(self):
+        bframe = BambooFrame({'a': [1.0, 2.0], 'b': ['x', 'y']})
+        other = BambooFrame({'a': [3.0], 'c': ['z']})
+        result = bframe.fast_concat([other])
+
+        self.assertEqual(result.columns.tolist(), ['a', 'b', 'c'])
+        self.assertEqual(result['a'].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(result['b'].tolist()[:2], ['x', 'y'])
+        self.assertEqual(result['c'].tolist()[2:], ['z'])
+
     def test_to_jsondict(self):
         jsondict = self.bframe.to_jsondict()
         self.assertEqual(len(jsondict), len(self.bframe))
@@ -1,4 +1,9 @@
+import numpy as np
+from pandas import DataFrame
+
 from bamboo.core.parser import ParseError, Parser
+from bamboo.lib.datetools import recognize_dates
+from bamboo.models.dataset import Dataset
 from bamboo.tests.test_base import TestBase
 
 
@@ -29,6 +34,97 @@ class TestParser(TestBase):
             self.parser.parse_formula('VAR + 1'))
         self.assertEqual(func(self.row, self.parser.context), 2)
 
+    def test_parse_columns(self):
+        dframe = DataFrame({'VAR': [1, 2, 3]})
+        _, functions = self.parser.parse_columns('VAR + 1')
+        column = functions[0](dframe, self.parser.context)
+        self.assertEqual(column.tolist(), [2, 3, 4])
+
+    def test_parse_columns_constant(self):
+        dframe = DataFrame({'VAR': [1, 2, 3]})
+        _, functions = self.parser.parse_columns('9 + 5')
+        column = functions[0](dframe, self.parser.context)
+        self.assertEqual(column.tolist(), [14] * 3)
+
+    def test_parse_columns_matches_parse_formula(self):
+        dataset = Dataset()
+        dataset.save(self.test_dataset_ids['good_eats.csv'])
+        dataset.save_observations(
+            recognize_dates(self.get_data('good_eats.csv')))
+        dframe = dataset.dframe()
+        parser = Parser(dataset)
+
+        formulas = [
+            '9 + 5',
+            'rating',
+            'gps',
+            'amount + gps_alt',
+            'amount - gps_alt',
+            'amount + 5',
+            'amount - gps_alt + 2.5',
+            'amount * gps_alt',
+            'amount / gps_alt',
+            'amount * gps_alt / 2.5',
+            'amount + gps_alt * gps_precision',
+            '(amount + gps_alt) * gps_precision',
+            'amount == 2',
+            '10 < amount',
+            '10 < amount + gps_alt',
+            'not amount == 2',
+            'not(amount == 2)',
+            'amount == 2 and 10 < amount',
+            'amount == 2 or 10 < amount',
+            'not not amount == 2 or 10 < amount',
+            'not amount == 2 or 10 < amount',
+            '(not amount == 2) or 10 < amount',
+            'not(amount == 2 or 10 < amount)',
+            'amount ^ 3',
+            '(amount + gps_alt) ^ 2 + 100',
+            'amount < gps_alt - 100',
+            'rating in ["delectible"]',
+            'risk_factor in ["low_risk"]',
+            'amount in ["9.0", "2.0", "20.0"]',
+            '(risk_factor in ["low_risk"]) and (amount in ["9.0", "20.0"])',
+            'date("09-04-2012") - submit_date > 21078000',
+            'case food_type in ["morning_food"]: 1, default: 3',
+            'percentile(amount)',
+            # missing column, falls back to evaluating row by row
+            'not_a_column + 1',
+        ]
+
+        for formula in formulas:
+            _, row_functions = parser.parse_formula(formula)
+            _, column_functions = parser.parse_columns(formula)
+
+            expected = dframe.apply(
+                row_functions[0], axis=1, args=(parser.context, ))
+            result = column_functions[0](dframe, parser.context)
+
+            self.assertEqual(len(expected), len(result), formula)
+
+            for idx in expected.index:
+                self._assert_values_equal(
+                    expected[idx], result[idx], formula)
+
+    def _assert_values_equal(self, expected, result, formula):
+        msg = '%s != %s, formula: %s' % (expected, result, formula)
+
+        try:
+            expected = np.float64(expected)
+            result = np.float64(result)
+        except (TypeError, ValueError):
+            self.assertEqual(expected, result, msg)
+            return
+
+        if not (np.isnan(expected) and np.isnan(result)):
+            self.assertAlmostEqual(expected, result, 5, msg)
+
+    def test_parse_formula_cached(self):
+        _, functions = self.parser.parse_formula('VAR + 1')
+        _, cached_functions = Parser().parse_formula('VAR + 1')
+        self.assertTrue(
+            functions[0].func.im_self is cached_functions[0].func.im_self)
+
     def test_parse_formula_bad_formula(self):
         bad_formulas = [
             '=BAD +++ FOR',
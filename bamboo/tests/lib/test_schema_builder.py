@@ -0,0 +1,30 @@
+import numpy as np
+from pandas import Series
+
+from bamboo.lib.schema_builder import INTEGER, LABEL, MEASURE, OLAP_TYPE,\
+    SIMPLETYPE, Schema
+from bamboo.tests.test_base import TestBase
+
+
+class TestSchemaBuilder(TestBase):
+
+    def setUp(self):
+        TestBase.setUp(self)
+        self.schema = Schema({'amount': {
+            LABEL: 'amount', OLAP_TYPE: MEASURE, SIMPLETYPE: INTEGER}})
+
+    def test_convert_column(self):
+        column = self.schema.convert_column('amount', Series(['1', '2']))
+        self.assertEqual(column.dtype, np.int64)
+        self.assertEqual(column.tolist(), [1, 2])
+
+    def test_convert_column_with_nulls(self):
+        column = self.schema.convert_column(
+            'amount', Series(['1', np.nan, '3']))
+        self.assertEqual(column[0], 1)
+        self.assertTrue(np.isnan(column[1]))
+        self.assertEqual(column[2], 3)
+
+    def test_convert_column_not_in_schema(self):
+        column = Series(['1', '2'])
+        self.assertTrue(self.schema.convert_column('other', column) is column)
@@ -4,6 +4,7 @@ import re
 from pandas import DataFrame
 from pymongo.cursor import Cursor
 
+from bamboo.core.frame import BambooFrame
 from bamboo.tests.test_base import TestBase
 from bamboo.models.dataset import Dataset
 from bamboo.models.observation import Observation
@@ -111,3 +112,47 @@ class TestDataset(TestBase):
             self.assertFalse(key in columns)
         # ensure date is converted
         self.assertTrue(isinstance(dframe.submit_date[0], datetime))
+
+    def _save_good_eats(self):
+        dataset = Dataset()
+        dataset.save(self.test_dataset_ids['good_eats.csv'])
+        dataset.save_observations(
+            recognize_dates(self.get_data('good_eats.csv')))
+
+        return Dataset.find_one(self.test_dataset_ids['good_eats.csv'])
+
+    def test_append_observations(self):
+        dataset = self._save_good_eats()
+        num_rows = dataset.num_rows
+
+        dataset.append_observations(BambooFrame({
+            'food_type': ['lunch', 'dinner'], 'amount': [1, 2]}))
+        dataset = Dataset.find_one(self.test_dataset_ids['good_eats.csv'])
+
+        self.assertEqual(dataset.num_rows, num_rows + 2)
+        self.assertEqual(len(dataset.dframe()), num_rows + 2)
+
+    def test_append_observations_cardinality(self):
+        dataset = self._save_good_eats()
+        cardinality = dataset.schema.cardinality('food_type')
+        stored = dataset.dframe()['food_type'][0]
+
+        dataset.append_observations(BambooFrame({
+            'food_type': [stored, stored, 'not_a_stored_food', 'another_new'],
+        }))
+        dataset = Dataset.find_one(self.test_dataset_ids['good_eats.csv'])
+
+        self.assertEqual(dataset.schema.cardinality('food_type'),
+                         cardinality + 2)
+
+    def test_append_observations_new_column(self):
+        dataset = self._save_good_eats()
+        columns = dataset.schema.keys()
+
+        dataset.append_observations(BambooFrame({
+            'food_type': ['lunch'], 'new_column': ['new_value']}))
+        dataset = Dataset.find_one(self.test_dataset_ids['good_eats.csv'])
+
+        self.assertTrue('new_column' in dataset.schema.keys())
+        self.assertEqual(dataset.schema.cardinality('new_column'), 1)
+        self.assertEqual(len(dataset.schema.keys()), len(columns) + 1)